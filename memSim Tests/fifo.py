@@ -1,5 +1,7 @@
 # This file is the implementation for the FIFO page replacement algorithm.
 
+from collections import deque
+
 def fifo(pages, capacity):
     """
     Simulates the FIFO page replacement algorithm.
@@ -11,16 +13,26 @@ def fifo(pages, capacity):
     Returns:
         int: The number of page faults that occurred during the simulation.
     """
-    memory = []
+    # Every page fits, so only the first access to each one faults
+    distinct_pages = len(set(pages))
+    if distinct_pages <= capacity:
+        return distinct_pages
+
+    order = deque()  # Pages in the order they were loaded
+    present = set()  # Same pages, for constant time membership checks
     page_faults = 0
 
+    # Bind the methods used on every fault once, outside the loop
+    popleft, append = order.popleft, order.append
+    discard, add = present.discard, present.add
+
     for page in pages:
-        if page not in memory:
-            if len(memory) < capacity:
-                memory.append(page)
-            else:
-                memory.pop(0)  # Remove the oldest page
-                memory.append(page)
-            page_faults += 1
+        if page in present:
+            continue
+        if page_faults >= capacity:  # Memory fills after capacity faults
+            discard(popleft())  # Remove the oldest page
+        append(page)
+        add(page)
+        page_faults += 1
 
     return page_faults
\ No newline at end of file
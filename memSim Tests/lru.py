@@ -1,5 +1,7 @@
 # Implementation of LRU Cache
 
+from collections import OrderedDict
+
 def lru(pages, capacity):
     """
     Function to simulate LRU Cache
@@ -12,20 +14,25 @@ def lru(pages, capacity):
         int: The number of page faults that occurred during the simulation.
     """
 
-    cache = []
+    # Every page fits, so only the first access to each one faults
+    distinct_pages = len(set(pages))
+    if distinct_pages <= capacity:
+        return distinct_pages
+
+    cache = OrderedDict()  # Least recently used page first
     page_faults = 0
 
+    # Bind the methods used on every access once, outside the loop
+    move_to_end, popitem = cache.move_to_end, cache.popitem
+
     for page in pages:
-        if page not in cache:
-            if len(cache) < capacity:
-                cache.append(page)
-            else:
-                cache.pop(0)  # Remove the least recently used page
-                cache.append(page)
-            page_faults += 1
-        else:
+        if page in cache:
             # Move the accessed page to the end to mark it as recently used
-            cache.remove(page)
-            cache.append(page)
+            move_to_end(page)
+            continue
+        if page_faults >= capacity:  # Memory fills after capacity faults
+            popitem(last=False)  # Remove the least recently used page
+        cache[page] = None
+        page_faults += 1
 
     return page_faults
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+Load memSim.py as a module so the test scripts can run it in-process
+"""
+
+import os
+import importlib.util
+
+def load_memsim(memsim_path="./memSim"):
+    """Import the script memsim_path points to, returns None if it is not a Python file"""
+    script = os.path.realpath(memsim_path)
+    if not script.endswith(".py") or not os.path.exists(script):
+        return None
+    
+    spec = importlib.util.spec_from_file_location("memSim", script)
+    memsim = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(memsim)
+    return memsim
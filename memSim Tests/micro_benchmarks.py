@@ -6,8 +6,11 @@ These tests are designed to highlight specific strengths/weaknesses
 
 import subprocess
 import os
+import atexit
+import tempfile
 import matplotlib.pyplot as plt
 import json
+from memsim_loader import load_memsim
 from typing import List, Dict
 
 class MicroBenchmark:
@@ -16,32 +19,43 @@ class MicroBenchmark:
     def __init__(self, memsim_path="./memSim"):
         self.memsim_path = memsim_path
         self.results = {}
+        self.test_file = None  # Address file reused by every subprocess run
+        
+        # Run in-process instead of starting a new interpreter per data point
+        self.memsim = load_memsim(memsim_path)
     
     def run_single_test(self, name: str, addresses: List[int], frames: int, algorithm: str):
         """Run a single test configuration"""
-        test_file = f"micro_{name}_{algorithm}_{frames}.txt"
-        
-        with open(test_file, 'w') as f:
-            for addr in addresses:
-                f.write(f"{addr}\n")
-        
+        if self.memsim is not None:
+            return self.run_in_process(addresses, frames, algorithm)
+        
+        if self.test_file is None:
+            self.test_file = tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False)
+            atexit.register(os.remove, self.test_file.name)
+        
+        # Overwrite the previous run's addresses in place
+        f = self.test_file
+        f.seek(0)
+        f.truncate()
+        f.write("\n".join(map(str, addresses)) + "\n")
+        f.flush()
+        
+        # --quiet leaves only the statistics on stdout
+        result = subprocess.run([self.memsim_path, f.name, str(frames), algorithm, "--quiet"], 
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        
+        _, found, tail = result.stdout.rpartition("Page Faults =")
+        return int(tail.split(None, 1)[0]) if found else 0
+    
+    def run_in_process(self, addresses: List[int], frames: int, algorithm: str):
+        """Run a single test configuration on the imported simulator"""
+        sim = self.memsim.VirtualMemorySimulator(frames, algorithm, "BACKING_STORE.bin")
         try:
-            result = subprocess.run([self.memsim_path, test_file, str(frames), algorithm], 
-                                  capture_output=True, text=True)
-            
-            lines = result.stdout.strip().split('\n')
-            page_faults = 0
-            
-            for line in lines:
-                if line.startswith("Page Faults ="):
-                    page_faults = int(line.split('=')[1].strip())
-                    break
-            
-            return page_faults
-            
+            sim.run(addresses)
         finally:
-            if os.path.exists(test_file):
-                os.remove(test_file)
+            sim.close()
+        
+        return sim.page_faults
     
     def test_stack_distance(self):
         """Test with varying stack distances (temporal locality)"""
@@ -1,5 +1,7 @@
 # Implementation of a theoretical optimal page replacement algorithm
 
+import heapq
+
 def opt(pages, capacity):
     """
     Simulates the Optimal page replacement algorithm.
@@ -11,28 +13,38 @@ def opt(pages, capacity):
     Returns:
         int: The number of page faults that occurred during the simulation.
     """
-    memory = []
+    # Every page fits, so only the first access to each one faults
+    distinct_pages = len(set(pages))
+    if distinct_pages <= capacity:
+        return distinct_pages
+
+    never = len(pages)  # Sorts after every real index
+
+    # next_use[i] is the index where pages[i] is accessed again
+    next_use = [never] * len(pages)
+    last_seen = {}
+    for i in range(len(pages) - 1, -1, -1):
+        next_use[i] = last_seen.get(pages[i], never)
+        last_seen[pages[i]] = i
+
+    memory = {}  # page -> index of its next use
+    farthest = []  # Max-heap of (-next use, page), may hold stale entries
     page_faults = 0
 
-    for i, page in enumerate(pages):
+    # Bind the functions used on every access once, outside the loop
+    heappush, heappop, resident = heapq.heappush, heapq.heappop, memory.get
+
+    for page, use in zip(pages, next_use):
         if page not in memory:
-            if len(memory) < capacity:
-                memory.append(page)
-            else:
-                # Find the page to replace
-                farthest = -1
-                page_to_replace = -1
-                for mem_page in memory:
-                    try:
-                        next_use = pages[i + 1:].index(mem_page)
-                    except ValueError:
-                        next_use = float('inf')  # Page not found again
-                    if next_use > farthest:
-                        farthest = next_use
-                        page_to_replace = mem_page
-
-                memory.remove(page_to_replace)
-                memory.append(page)
+            if page_faults >= capacity:  # Memory fills after capacity faults
+                # Find the page to replace, skipping entries that are out of date
+                while True:
+                    neg_use, victim = heappop(farthest)
+                    if resident(victim) == -neg_use:
+                        break
+                del memory[victim]
             page_faults += 1
+        memory[page] = use
+        heappush(farthest, (-use, page))
 
     return page_faults
\ No newline at end of file
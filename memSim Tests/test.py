@@ -22,11 +22,10 @@ def create_backing_store(filename="BACKING_STORE.bin", size=65536):
 
 def create_test_addresses(filename="addresses.txt", count=1000):
     """Create a test file with random addresses"""
+    # Generate 16-bit addresses
+    addresses = [random.randint(0, 65535) for _ in range(count)]
     with open(filename, 'w') as f:
-        for _ in range(count):
-            # Generate 16-bit addresses
-            address = random.randint(0, 65535)
-            f.write(f"{address}\n")
+        f.write("\n".join(map(str, addresses)) + "\n")
     print(f"Created {filename} with {count} addresses")
 
 def create_simple_test_addresses(filename="simple_addresses.txt"):
@@ -41,8 +40,7 @@ def create_simple_test_addresses(filename="simple_addresses.txt"):
     ]
     
     with open(filename, 'w') as f:
-        for addr in addresses:
-            f.write(f"{addr}\n")
+        f.write("\n".join(map(str, addresses)) + "\n")
     print(f"Created {filename} with simple test addresses")
 
 def main():
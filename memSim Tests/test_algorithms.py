@@ -5,60 +5,79 @@ This script creates various test scenarios to verify algorithm effectiveness
 """
 
 import subprocess
+import sys
 import os
+import re
 import random
+import array
 import json
-from typing import List, Dict, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple, NamedTuple, Optional, Sequence
+from memsim_loader import load_memsim
+
+RANDOM_SEED = 0  # Fixed so runs are reproducible
+
+# Matches the statistics memSim prints once the simulation is done
+STAT_RE = re.compile(r'^(Page Faults|Page Fault Rate|TLB Hits|TLB Misses|TLB Hit Rate)\s*=\s*([\d.]+)%?')
 
 class TestGenerator:
     """Generate various test patterns for algorithm comparison"""
     
+    @staticmethod
+    def pack_addresses(pages, offsets):
+        """Pack page numbers and offsets into an array of 16-bit addresses"""
+        # memSim only keeps the low 8 bits of the page number, so mask it here
+        return array.array('H', (((page & 0xFF) << 8) | offset
+                                 for page, offset in zip(pages, offsets)))
+    
     @staticmethod
     def create_backing_store(filename="BACKING_STORE.bin"):
         """Create a backing store with predictable patterns"""
+        # Reuse one left by an earlier run
+        try:
+            if os.stat(filename).st_size == 65536:
+                return
+        except FileNotFoundError:
+            pass
+        
+        # Each byte contains the page number for easy verification
+        data = b"".join(bytes([page]) * 256 for page in range(256))
         with open(filename, 'wb') as f:
-            for page in range(256):
-                page_data = bytearray(256)
-                for i in range(256):
-                    # Each byte contains the page number for easy verification
-                    page_data[i] = page
-                f.write(page_data)
+            f.write(data)
     
     @staticmethod
     def sequential_access(start_page=0, num_pages=20, accesses_per_page=3):
         """Generate sequential page access pattern"""
-        addresses = []
-        for page in range(start_page, start_page + num_pages):
-            for _ in range(accesses_per_page):
-                # Random offset within the page
-                offset = random.randint(0, 255)
-                addresses.append((page << 8) | offset)
-        return addresses
+        # Random offsets within each page, drawn in one call
+        offsets = random.randbytes(num_pages * accesses_per_page)
+        pages = [page for page in range(start_page, start_page + num_pages)
+                 for _ in range(accesses_per_page)]
+        return TestGenerator.pack_addresses(pages, offsets)
     
     @staticmethod
     def temporal_locality_pattern(hot_pages: List[int], cold_pages: List[int], 
                                 hot_ratio=0.8, total_accesses=1000):
         """Generate pattern with temporal locality (80/20 rule)"""
-        addresses = []
-        for _ in range(total_accesses):
-            if random.random() < hot_ratio:
-                page = random.choice(hot_pages)
-            else:
-                page = random.choice(cold_pages)
-            offset = random.randint(0, 255)
-            addresses.append((page << 8) | offset)
-        return addresses
+        # Split hot_ratio evenly over the hot pages and the rest over the cold
+        # pages, so one weighted draw picks every page. An empty group gets no weights
+        population = hot_pages + cold_pages
+        weights = []
+        if hot_pages:
+            weights += [hot_ratio / len(hot_pages)] * len(hot_pages)
+        if cold_pages:
+            weights += [(1 - hot_ratio) / len(cold_pages)] * len(cold_pages)
+        pages = random.choices(population, weights=weights, k=total_accesses)
+        offsets = random.randbytes(total_accesses)
+        return TestGenerator.pack_addresses(pages, offsets)
     
     @staticmethod
     def cyclic_pattern(pages: List[int], cycles=5):
         """Generate cyclic access pattern (good for testing FIFO vs LRU)"""
-        addresses = []
-        for _ in range(cycles):
-            for page in pages:
-                for _ in range(3):  # Multiple accesses per page
-                    offset = random.randint(0, 255)
-                    addresses.append((page << 8) | offset)
-        return addresses
+        # Multiple accesses per page
+        sequence = [page for _ in range(cycles) for page in pages for _ in range(3)]
+        offsets = random.randbytes(len(sequence))
+        return TestGenerator.pack_addresses(sequence, offsets)
     
     @staticmethod
     def optimal_showcase_pattern():
@@ -86,7 +105,7 @@ class TestGenerator:
         for page in [0, 1, 2]:
             addresses.append((page << 8) | 0)
         
-        return addresses
+        return array.array('H', addresses)
     
     @staticmethod
     def lru_worst_case():
@@ -98,7 +117,7 @@ class TestGenerator:
         for cycle in range(3):
             for page in range(num_pages):
                 addresses.append((page << 8) | 0)
-        return addresses
+        return array.array('H', addresses)
     
     @staticmethod
     def fifo_anomaly_pattern():
@@ -108,98 +127,135 @@ class TestGenerator:
         addresses = []
         for page in pages:
             addresses.append((page << 8) | 0)
-        return addresses
+        return array.array('H', addresses)
     
     @staticmethod
     def working_set_pattern():
         """Simulate a working set that changes over time"""
-        addresses = []
-        
         # Working set 1: pages 0-4
-        for _ in range(100):
-            page = random.choice([0, 1, 2, 3, 4])
-            addresses.append((page << 8) | random.randint(0, 255))
+        pages = random.choices([0, 1, 2, 3, 4], k=100)
         
         # Transition period
-        for _ in range(20):
-            page = random.choice([4, 5, 6, 7, 8])
-            addresses.append((page << 8) | random.randint(0, 255))
+        pages += random.choices([4, 5, 6, 7, 8], k=20)
         
         # Working set 2: pages 5-9
-        for _ in range(100):
-            page = random.choice([5, 6, 7, 8, 9])
-            addresses.append((page << 8) | random.randint(0, 255))
+        pages += random.choices([5, 6, 7, 8, 9], k=100)
         
-        return addresses
+        offsets = random.randbytes(len(pages))
+        return TestGenerator.pack_addresses(pages, offsets)
+    
+    @staticmethod
+    def random_access(total_accesses=2000):
+        """Generate uniformly random 16-bit addresses"""
+        return array.array('H', random.randbytes(2 * total_accesses))
+
+class Stats(NamedTuple):
+    """Statistics from a single memSim run"""
+    page_faults: int
+    page_fault_rate: float
+    tlb_hits: int
+    tlb_misses: int
+    tlb_hit_rate: float
+    total_accesses: int
+    error: Optional[str] = None  # Set instead of the statistics if the run failed
 
 class TestRunner:
     """Run tests and collect results"""
+    __slots__ = ('memsim_path', 'cache', 'memsim')
     
     def __init__(self, memsim_path="./memSim"):
         self.memsim_path = memsim_path
-        
-    def run_test(self, addresses: List[int], frames: int, algorithm: str) -> Dict:
+        self.cache = {}  # (address bytes, frames, algorithm) -> parsed results
+        # Run in-process instead of starting a new interpreter per test
+        self.memsim = load_memsim(memsim_path)
+    
+    def run_test(self, addresses: Sequence[int], frames: int, algorithm: str) -> Stats:
         """Run a single test and parse results"""
-        # Write addresses to temp file
-        test_file = f"temp_test_{algorithm}_{frames}.txt"
-        with open(test_file, 'w') as f:
-            for addr in addresses:
-                f.write(f"{addr}\n")
+        # The same run is deterministic, so only do it once. memSim keeps the
+        # low 16 bits of each address, so key on those
+        if isinstance(addresses, array.array) and addresses.typecode == 'H':
+            address_bytes = addresses.tobytes()
+        else:
+            address_bytes = array.array('H', (address & 0xFFFF for address in addresses)).tobytes()
+        key = (address_bytes, frames, algorithm)
+        if key in self.cache:
+            return self.cache[key]
+        
+        if self.memsim is not None:
+            result = self.run_in_process(addresses, frames, algorithm)
+        else:
+            result = self.run_subprocess(addresses, frames, algorithm)
         
+        if result.error is None:
+            self.cache[key] = result
+        return result
+    
+    def run_in_process(self, addresses: Sequence[int], frames: int, algorithm: str) -> Stats:
+        """Run a single test on the imported simulator"""
+        # Reject the same arguments memSim's main() does
+        error = self.memsim.validate_arguments(frames, algorithm)
+        if error is not None:
+            return Stats(0, 0.0, 0, 0, 0.0, len(addresses), error=f"memSim rejected arguments: {error}")
+        
+        sim = self.memsim.VirtualMemorySimulator(frames, algorithm, "BACKING_STORE.bin")
         try:
-            # Run memSim
-            result = subprocess.run([self.memsim_path, test_file, str(frames), algorithm], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                return {"error": f"memSim failed: {result.stderr}"}
-            
-            # Parse output
-            lines = result.stdout.strip().split('\n')
-            
-            # Find statistics lines
-            page_faults = 0
-            page_fault_rate = 0.0
-            tlb_hits = 0
-            tlb_misses = 0
-            tlb_hit_rate = 0.0
-            
-            for line in lines:
-                if line.startswith("Page Faults ="):
-                    page_faults = int(line.split('=')[1].strip())
-                elif line.startswith("Page Fault Rate ="):
-                    page_fault_rate = float(line.split('=')[1].strip().rstrip('%'))
-                elif line.startswith("TLB Hits ="):
-                    tlb_hits = int(line.split('=')[1].strip())
-                elif line.startswith("TLB Misses ="):
-                    tlb_misses = int(line.split('=')[1].strip())
-                elif line.startswith("TLB Hit Rate ="):
-                    tlb_hit_rate = float(line.split('=')[1].strip().rstrip('%'))
-            
-            return {
-                "page_faults": page_faults,
-                "page_fault_rate": page_fault_rate,
-                "tlb_hits": tlb_hits,
-                "tlb_misses": tlb_misses,
-                "tlb_hit_rate": tlb_hit_rate,
-                "total_accesses": len(addresses)
-            }
-            
+            sim.run(addresses)
         finally:
-            # Clean up temp file
-            if os.path.exists(test_file):
-                os.remove(test_file)
-
-def run_all_tests():
-    """Run comprehensive test suite"""
-    print("=== Virtual Memory Algorithm Effectiveness Test Suite ===\n")
-    
-    # Create backing store
-    TestGenerator.create_backing_store()
-    runner = TestRunner()
+            sim.close()
+        
+        # Rates rounded the same way memSim prints them
+        total = sim.total_accesses
+        return Stats(
+            page_faults=sim.page_faults,
+            page_fault_rate=round(sim.page_faults / total * 100, 2) if total else 0.0,
+            tlb_hits=sim.tlb_hits,
+            tlb_misses=sim.tlb_misses,
+            tlb_hit_rate=round(sim.tlb_hits / total * 100, 2) if total else 0.0,
+            total_accesses=len(addresses)
+        )
     
-    # Test configurations
-    test_cases = [
+    def run_subprocess(self, addresses: Sequence[int], frames: int, algorithm: str) -> Stats:
+        """Run a single test through the memSim executable and parse its output"""
+        # Addresses are piped to memSim's stdin rather than through a temp file,
+        # --quiet keeps the per-address trace off the pipe
+        payload = "\n".join(map(str, addresses)) + "\n"
+        result = subprocess.run([self.memsim_path, "-", str(frames), algorithm, "--quiet"],
+                                input=payload, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True)
+        
+        if result.returncode != 0:
+            # memSim reports bad arguments on stdout, crashes leave a traceback on stderr
+            output = (result.stdout.strip() + "\n" + result.stderr.strip()).strip()
+            message = f"memSim failed (exit {result.returncode}): {output}"
+            return Stats(0, 0.0, 0, 0, 0.0, len(addresses), error=message)
+        
+        # Statistics are the last few lines, skip the per-address trace before them
+        lines = result.stdout[-1024:].split('\n')[-10:]
+        
+        # Find statistics lines
+        stats = {}
+        for line in lines:
+            match = STAT_RE.match(line)
+            if match:
+                stats[match.group(1)] = match.group(2)
+        
+        return Stats(
+            page_faults=int(stats.get("Page Faults", 0)),
+            page_fault_rate=float(stats.get("Page Fault Rate", 0.0)),
+            tlb_hits=int(stats.get("TLB Hits", 0)),
+            tlb_misses=int(stats.get("TLB Misses", 0)),
+            tlb_hit_rate=float(stats.get("TLB Hit Rate", 0.0)),
+            total_accesses=len(addresses)
+        )
+
+@lru_cache(maxsize=None)
+def get_runner():
+    """Return the TestRunner shared by every test in this process"""
+    return TestRunner()
+
+def build_test_cases():
+    """Build the test configurations, generating each address list"""
+    return [
         {
             "name": "Small Sequential Access",
             "addresses": TestGenerator.sequential_access(0, 10, 2),
@@ -244,62 +300,127 @@ def run_all_tests():
         },
         {
             "name": "Large Random Test",
-            "addresses": [random.randint(0, 65535) for _ in range(2000)],
+            "addresses": TestGenerator.random_access(2000),
             "frames": [16, 32],
             "description": "2000 random memory accesses"
         }
     ]
+
+def analyze_results(test_cases, all_results, algorithms):
+    """Rank the algorithms for every run and find FIFO anomalies across frame counts"""
+    rankings = {}  # (test name, frames) -> (best algorithm, worst algorithm)
+    anomalies = {}  # test name -> [(frames, faults, more frames, more faults)]
+    
+    for test_case in test_cases:
+        name = test_case['name']
+        
+        for frames in test_case['frames']:
+            results = [(algorithm, all_results[(name, frames, algorithm)]) for algorithm in algorithms]
+            if any(result.error is not None for _, result in results):
+                continue
+            
+            # Find both in one pass, ties go to the first algorithm
+            best_algo = worst_algo = None
+            best_faults, worst_faults = float('inf'), -1
+            for algorithm, result in results:
+                page_faults = result.page_faults
+                if page_faults < best_faults:
+                    best_algo, best_faults = algorithm, page_faults
+                if page_faults > worst_faults:
+                    worst_algo, worst_faults = algorithm, page_faults
+            rankings[(name, frames)] = (best_algo, worst_algo)
+        
+        # Belady's anomaly: FIFO faulting more with more frames
+        frame_counts = sorted(test_case['frames'])
+        for fewer, more in zip(frame_counts, frame_counts[1:]):
+            fewer_result = all_results[(name, fewer, "FIFO")]
+            more_result = all_results[(name, more, "FIFO")]
+            if fewer_result.error is None and more_result.error is None \
+                    and more_result.page_faults > fewer_result.page_faults:
+                anomalies.setdefault(name, []).append(
+                    (fewer, fewer_result.page_faults, more, more_result.page_faults))
+    
+    return rankings, anomalies
+
+def run_all_tests():
+    """Run comprehensive test suite"""
+    print("=== Virtual Memory Algorithm Effectiveness Test Suite ===\n")
+    
+    # Create backing store
+    TestGenerator.create_backing_store()
+    
+    test_cases = build_test_cases()
     
     algorithms = ["FIFO", "LRU", "OPT"]
+    runner = get_runner()
+    
+    runs = [(test_case['name'], test_case['addresses'], frames, algorithm)
+            for test_case in test_cases
+            for frames in test_case['frames']
+            for algorithm in algorithms]
+    
+    if runner.memsim is not None:
+        # In-process runs are CPU-bound and hold the GIL, threads would only add overhead
+        all_results = {(name, frames, algorithm): runner.run_test(addresses, frames, algorithm)
+                       for name, addresses, frames, algorithm in runs}
+    else:
+        # Subprocess runs mostly wait on memSim, so start them all at once
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(runner.run_test, addresses, frames, algorithm):
+                    (name, frames, algorithm)
+                for name, addresses, frames, algorithm in runs
+            }
+            all_results = {futures[future]: future.result() for future in as_completed(futures)}
+    
+    rankings, anomalies = analyze_results(test_cases, all_results, algorithms)
     
     for test_case in test_cases:
-        print(f"🧪 {test_case['name']}")
-        print(f"   {test_case['description']}")
-        print(f"   Total accesses: {len(test_case['addresses'])}")
-        print()
+        name = test_case['name']
+        
+        # Report each test case with a single write
+        out = []
+        out.append(f"🧪 {name}")
+        out.append(f"   {test_case['description']}")
+        out.append(f"   Total accesses: {len(test_case['addresses'])}")
+        out.append("")
         
         for frames in test_case['frames']:
-            print(f"   📊 Results with {frames} frames:")
-            results = {}
+            out.append(f"   📊 Results with {frames} frames:")
             
             for algorithm in algorithms:
-                result = runner.run_test(test_case['addresses'], frames, algorithm)
-                if 'error' in result:
-                    print(f"      ❌ {algorithm}: {result['error']}")
+                result = all_results[(name, frames, algorithm)]
+                if result.error is not None:
+                    out.append(f"      ❌ {algorithm}: {result.error}")
                 else:
-                    results[algorithm] = result
-                    print(f"      {algorithm:4}: {result['page_faults']:3d} page faults ({result['page_fault_rate']:5.1f}%)")
+                    out.append(f"      {algorithm:4}: {result.page_faults:3d} page faults ({result.page_fault_rate:5.1f}%)")
             
-            # Analysis
-            if len(results) == 3:
-                best_algo = min(results.keys(), key=lambda x: results[x]['page_faults'])
-                worst_algo = max(results.keys(), key=lambda x: results[x]['page_faults'])
-                
-                print(f"      🏆 Best: {best_algo} | 💥 Worst: {worst_algo}")
+            if (name, frames) in rankings:
+                best_algo, worst_algo = rankings[(name, frames)]
+                out.append(f"      🏆 Best: {best_algo} | 💥 Worst: {worst_algo}")
                 
                 # Check if OPT is optimal
                 if best_algo == "OPT":
-                    print("      ✅ OPT performed optimally as expected")
+                    out.append("      ✅ OPT performed optimally as expected")
                 else:
-                    print("      ⚠️  OPT was not the best (unusual but possible with ties)")
-                
-                # Check for anomalies
-                if test_case['name'] == "FIFO Anomaly Pattern" and len(test_case['frames']) > 1:
-                    fifo_3 = None
-                    fifo_4 = None
-                    # This would need to be tracked across frame sizes
+                    out.append("      ⚠️  OPT was not the best (unusual but possible with ties)")
             
-            print()
+            out.append("")
         
-        print("-" * 60)
-        print()
+        for fewer, fewer_faults, more, more_faults in anomalies.get(name, []):
+            out.append(f"   📈 FIFO anomaly: {fewer_faults} page faults with {fewer} frames "
+                       f"but {more_faults} with {more}")
+            out.append("")
+        
+        out.append("-" * 60)
+        out.append("")
+        sys.stdout.write("\n".join(out) + "\n")
 
 def create_belady_anomaly_test():
     """Special test to demonstrate Belady's anomaly with FIFO"""
     print("🔍 Testing Belady's Anomaly (FIFO should perform worse with more frames)")
     
     TestGenerator.create_backing_store()
-    runner = TestRunner()
     
     # Classic anomaly pattern
     addresses = TestGenerator.fifo_anomaly_pattern()
@@ -307,9 +428,10 @@ def create_belady_anomaly_test():
     print(f"Pattern: {[addr >> 8 for addr in addresses]}")
     print("Testing with 3 and 4 frames:")
     
+    runner = get_runner()
     for frames in [3, 4]:
         result = runner.run_test(addresses, frames, "FIFO")
-        print(f"  FIFO with {frames} frames: {result['page_faults']} page faults")
+        print(f"  FIFO with {frames} frames: {result.page_faults} page faults")
     
     print("\nIf Belady's anomaly occurs, 4 frames should have MORE page faults than 3 frames!")
 
@@ -318,6 +440,8 @@ def main():
         print("❌ memSim not found. Please build it first with 'make'")
         return
     
+    random.seed(RANDOM_SEED)
+    
     # Run main test suite
     run_all_tests()
     
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 
 import sys
-import struct
+import mmap
+import array
 from collections import deque, OrderedDict
 
 TLB_SIZE = 16  # Change this for different TLB tests
+OUTPUT_CHUNK = 4096  # Lines of output buffered per write to stdout
 
 class TLB:
     """Translation Lookaside Buffer with 16 entries using FIFO replacement"""
@@ -26,33 +28,38 @@ class TLB:
             self.entries.popitem(last=False)
         
         self.entries[page_num] = frame_num
-
-class PageTableEntry:
-    """Entry in the page table"""
-    def __init__(self):
-        self.present = False
-        self.frame_num = None
+    
+    def remove(self, page_num):
+        """Remove page from TLB if present"""
+        self.entries.pop(page_num, None)
 
 class PageTable:
-    """Page table with 256 entries"""
+    """Page table with 256 entries, stored as parallel arrays"""
     def __init__(self):
-        self.entries = [PageTableEntry() for _ in range(256)]
+        self.present = bytearray(256)
+        self.frame_num = array.array('i', [-1] * 256)
     
     def lookup(self, page_num):
-        """Returns PageTableEntry for the given page number"""
-        return self.entries[page_num]
+        """Returns frame number if the page is present, None otherwise"""
+        if self.present[page_num]:
+            return self.frame_num[page_num]
+        return None
     
     def set_entry(self, page_num, frame_num):
         """Set page table entry as present and assign frame"""
-        entry = self.entries[page_num]
-        entry.present = True
-        entry.frame_num = frame_num
+        self.present[page_num] = 1
+        self.frame_num[page_num] = frame_num
+    
+    def invalidate(self, page_num):
+        """Mark page table entry as not present"""
+        self.present[page_num] = 0
 
 class PhysicalMemory:
     """Physical memory management"""
     def __init__(self, num_frames):
         self.num_frames = num_frames
-        self.frames = [bytearray(256) for _ in range(num_frames)]
+        self.frames = [bytes(256)] * num_frames  # Only replaced whole, never mutated
+        self.frame_hex = [None] * num_frames  # Cached hex of each frame's content
         self.frame_to_page = {}  # frame_num -> page_num mapping
         self.free_frames = deque(range(num_frames))
         
@@ -64,16 +71,24 @@ class PhysicalMemory:
     
     def load_page(self, frame_num, page_data, page_num):
         """Load page data into specified frame"""
-        self.frames[frame_num] = bytearray(page_data)
+        self.frames[frame_num] = page_data
+        self.frame_hex[frame_num] = None
         self.frame_to_page[frame_num] = page_num
     
     def get_frame_content(self, frame_num):
         """Get the content of a frame as hex string"""
-        return self.frames[frame_num].hex()
+        content = self.frame_hex[frame_num]
+        if content is None:
+            # Frames only change when a page is loaded, so cache until then
+            content = self.frames[frame_num].hex()
+            self.frame_hex[frame_num] = content
+        return content
     
     def get_byte(self, frame_num, offset):
         """Get a specific byte from a frame"""
-        return struct.unpack('b', self.frames[frame_num][offset:offset+1])[0]
+        # Bytes are stored unsigned, report them as signed
+        value = self.frames[frame_num][offset]
+        return value - 256 if value >= 128 else value
     
     def deallocate_frame(self, frame_num):
         """Mark frame as free"""
@@ -101,6 +116,10 @@ class FIFOAlgorithm(PageReplacementAlgorithm):
         """Record that a page was loaded into this frame"""
         self.insertion_order.append(frame_num)
     
+    def access_page(self, frame_num):
+        """No special tracking needed for FIFO"""
+        pass
+    
     def select_victim(self, reference_sequence=None, current_index=None):
         """Select the oldest frame"""
         return self.insertion_order.popleft()
@@ -109,13 +128,14 @@ class LRUAlgorithm(PageReplacementAlgorithm):
     """Least Recently Used page replacement"""
     def __init__(self, physical_memory, page_table):
         super().__init__(physical_memory, page_table)
-        self.usage_order = []  # Most recent at the end
+        self.usage_order = OrderedDict()  # frame_num -> None, most recent at the end
     
     def access_page(self, frame_num):
         """Record that a page in this frame was accessed"""
         if frame_num in self.usage_order:
-            self.usage_order.remove(frame_num)
-        self.usage_order.append(frame_num)
+            self.usage_order.move_to_end(frame_num)
+        else:
+            self.usage_order[frame_num] = None
     
     def add_page(self, frame_num):
         """Record that a page was loaded into this frame"""
@@ -123,12 +143,18 @@ class LRUAlgorithm(PageReplacementAlgorithm):
     
     def select_victim(self, reference_sequence=None, current_index=None):
         """Select the least recently used frame"""
-        return self.usage_order.pop(0)
+        return self.usage_order.popitem(last=False)[0]
 
 class OPTAlgorithm(PageReplacementAlgorithm):
     """Optimal page replacement (Belady's algorithm)"""
     def __init__(self, physical_memory, page_table):
         super().__init__(physical_memory, page_table)
+        self.reference_sequence = None
+        self.never = 0  # Next use of a page that is not referenced again
+        self.next_use_at = []  # index -> next index referencing the same page
+        self.first_use = {}  # page_num -> first index it is referenced at
+        self.cursor = {}  # page_num -> latest index it is known to be referenced at
+        self.last_index = -1  # current_index of the previous eviction
     
     def add_page(self, frame_num):
         """No special tracking needed for OPT"""
@@ -138,23 +164,48 @@ class OPTAlgorithm(PageReplacementAlgorithm):
         """No special tracking needed for OPT"""
         pass
     
+    def index_references(self, reference_sequence):
+        """Build the next-use table for the reference sequence in one reverse pass"""
+        self.reference_sequence = reference_sequence
+        self.never = len(reference_sequence)
+        self.next_use_at = [self.never] * len(reference_sequence)
+        first_use = {}
+        for i in range(len(reference_sequence) - 1, -1, -1):
+            page_num = reference_sequence[i]
+            self.next_use_at[i] = first_use.get(page_num, self.never)
+            first_use[page_num] = i
+        self.first_use = first_use
+        self.cursor = dict(first_use)
+        self.last_index = -1
+    
+    def next_use(self, page_num, current_index):
+        """Index of the next reference to page_num after current_index"""
+        # Follow the table forward from the last index found for this page
+        i = self.cursor.get(page_num, self.never)
+        while i <= current_index:
+            i = self.next_use_at[i]
+        self.cursor[page_num] = i
+        return i
+    
     def select_victim(self, reference_sequence, current_index):
         """Select the frame that will be used farthest in the future"""
+        if reference_sequence is not self.reference_sequence:
+            self.index_references(reference_sequence)
+        elif current_index < self.last_index:
+            # Cursors only move forward, start them over
+            self.cursor = dict(self.first_use)
+        self.last_index = current_index
+        
         frame_to_page = self.physical_memory.frame_to_page
         farthest_frame = None
         farthest_distance = -1
         
-        for frame_num in frame_to_page:
-            page_num = frame_to_page[frame_num]
+        for frame_num, page_num in frame_to_page.items():
+            next_use = self.next_use(page_num, current_index)
             
-            # Find next use of this page
-            next_use = float('inf')
-            for i in range(current_index + 1, len(reference_sequence)):
-                addr = reference_sequence[i]
-                future_page = (addr >> 8) & 0xFF
-                if future_page == page_num:
-                    next_use = i
-                    break
+            # A page that is never used again can't be beaten
+            if next_use == self.never:
+                return frame_num
             
             if next_use > farthest_distance:
                 farthest_distance = next_use
@@ -162,6 +213,12 @@ class OPTAlgorithm(PageReplacementAlgorithm):
         
         return farthest_frame
 
+def split_addresses(addresses):
+    """Split addresses into parallel lists of page numbers and offsets"""
+    page_nums = [(address >> 8) & 0xFF for address in addresses]
+    offsets = [address & 0xFF for address in addresses]
+    return page_nums, offsets
+
 class VirtualMemorySimulator:
     """Main virtual memory simulator"""
     def __init__(self, num_frames, replacement_algorithm, backing_store_file):
@@ -170,6 +227,7 @@ class VirtualMemorySimulator:
         self.page_table = PageTable()
         self.physical_memory = PhysicalMemory(num_frames)
         self.backing_store_file = backing_store_file
+        self.backing_store = self.open_backing_store(backing_store_file)
         
         # Initialize page replacement algorithm
         if replacement_algorithm == "FIFO":
@@ -181,21 +239,43 @@ class VirtualMemorySimulator:
         else:
             raise ValueError(f"Unknown replacement algorithm: {replacement_algorithm}")
         
+        # Called on every access that hits, bound once here
+        self.record_access = self.replacement_algo.access_page
+        
         # Statistics
         self.page_faults = 0
         self.tlb_hits = 0
         self.tlb_misses = 0
         self.total_accesses = 0
     
+    def open_backing_store(self, backing_store_file):
+        """Map the backing store into memory once, returns None if unavailable"""
+        try:
+            with open(backing_store_file, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError):
+            # Missing or empty backing store
+            return None
+    
+    def run(self, addresses):
+        """Translate every address, keeping only the statistics"""
+        page_nums, offsets = split_addresses(addresses)
+        for i, page_num in enumerate(page_nums):
+            self.translate_address(page_num, offsets[i], page_nums, i)
+    
+    def close(self):
+        """Release the backing store mapping"""
+        if self.backing_store is not None:
+            self.backing_store.close()
+            self.backing_store = None
+    
     def load_page_from_backing_store(self, page_num):
         """Load a page from backing store"""
-        try:
-            with open(self.backing_store_file, 'rb') as f:
-                f.seek(page_num * 256)
-                return f.read(256)
-        except IOError:
-            # If backing store doesn't exist or is too small, return zeros
+        if self.backing_store is None:
+            # If backing store doesn't exist, return zeros
             return bytes(256)
+        offset = page_num << 8
+        return self.backing_store[offset:offset + 256]
     
     def handle_page_fault(self, page_num, reference_sequence=None, current_index=None):
         """Handle a page fault by loading page from backing store"""
@@ -213,11 +293,10 @@ class VirtualMemorySimulator:
             
             # Invalidate the victim page in page table
             victim_page = self.physical_memory.frame_to_page[victim_frame]
-            self.page_table.entries[victim_page].present = False
+            self.page_table.invalidate(victim_page)
             
             # Remove from TLB if present
-            if victim_page in self.tlb.entries:
-                del self.tlb.entries[victim_page]
+            self.tlb.remove(victim_page)
             
             frame_num = victim_frame
         
@@ -230,31 +309,22 @@ class VirtualMemorySimulator:
         
         return frame_num
     
-    def translate_address(self, virtual_address, reference_sequence=None, current_index=None):
-        """Translate virtual address to physical address"""
-        # Extract page number and offset
-        page_num = (virtual_address >> 8) & 0xFF
-        offset = virtual_address & 0xFF
-        
+    def translate_address(self, page_num, offset, reference_sequence=None, current_index=None):
+        """Translate a virtual page number and offset to a physical address"""
         self.total_accesses += 1
         
         # Check TLB first
         frame_num = self.tlb.lookup(page_num)
         if frame_num is not None:
             self.tlb_hits += 1
-            # Update LRU if needed
-            if isinstance(self.replacement_algo, LRUAlgorithm):
-                self.replacement_algo.access_page(frame_num)
+            self.record_access(frame_num)
         else:
             self.tlb_misses += 1
             
             # Check page table
-            page_entry = self.page_table.lookup(page_num)
-            if page_entry.present:
-                frame_num = page_entry.frame_num
-                # Update LRU if needed
-                if isinstance(self.replacement_algo, LRUAlgorithm):
-                    self.replacement_algo.access_page(frame_num)
+            frame_num = self.page_table.lookup(page_num)
+            if frame_num is not None:
+                self.record_access(frame_num)
             else:
                 # Page fault
                 frame_num = self.handle_page_fault(page_num, reference_sequence, current_index)
@@ -279,29 +349,43 @@ class VirtualMemorySimulator:
         print(f"TLB Misses = {self.tlb_misses}")
         print(f"TLB Hit Rate = {tlb_hit_rate:.2f}%")
 
+def validate_arguments(frames, algorithm):
+    """Returns an error message for invalid FRAMES or PRA, None if both are valid"""
+    if frames <= 0 or frames > 256:
+        return "Error: FRAMES must be between 1 and 256"
+    if algorithm not in ["FIFO", "LRU", "OPT"]:
+        return "Error: PRA must be FIFO, LRU, or OPT"
+    return None
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: memSim <reference-sequence-file.txt> [FRAMES] [PRA]")
+    # --quiet skips the per-address output and only prints statistics
+    args = [arg for arg in sys.argv[1:] if arg != "--quiet"]
+    quiet = len(args) < len(sys.argv) - 1
+    
+    if len(args) < 1:
+        print("Usage: memSim <reference-sequence-file.txt | -> [FRAMES] [PRA] [--quiet]")
         print("Defaults: FRAMES=256, PRA=FIFO")
         sys.exit(1)
     
-    reference_file = sys.argv[1]
-    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 256
-    algorithm = sys.argv[3] if len(sys.argv) > 3 else "FIFO"
+    reference_file = args[0]
+    frames = int(args[1]) if len(args) > 1 else 256
+    algorithm = args[2] if len(args) > 2 else "FIFO"
     
     # Validate inputs
-    if frames <= 0 or frames > 256:
-        print("Error: FRAMES must be between 1 and 256")
+    error = validate_arguments(frames, algorithm)
+    if error is not None:
+        print(error)
         sys.exit(1)
     
-    if algorithm not in ["FIFO", "LRU", "OPT"]:
-        print("Error: PRA must be FIFO, LRU, or OPT")
-        sys.exit(1)
-    
-    # Read reference sequence
+    # Read reference sequence, "-" reads it from stdin
     try:
-        with open(reference_file, 'r') as f:
-            addresses = [int(line.strip()) & 0xFFFF for line in f if line.strip()]
+        if reference_file == "-":
+            text = sys.stdin.read()
+        else:
+            with open(reference_file, 'r') as f:
+                text = f.read()
+        # Let split() skip blank lines
+        addresses = [address & 0xFFFF for address in map(int, text.split())]
     except IOError:
         print(f"Error: Cannot read reference file {reference_file}")
         sys.exit(1)
@@ -310,15 +394,27 @@ def main():
     backing_store = "BACKING_STORE.bin"
     simulator = VirtualMemorySimulator(frames, algorithm, backing_store)
     
-    # Process each address
+    # Split every address into page number and offset up front, OPT looks
+    # ahead through the page numbers
+    page_nums, offsets = split_addresses(addresses)
+    
+    # Process each address, writing output a chunk of lines at a time
+    output = []
     for i, address in enumerate(addresses):
         frame_num, byte_value, frame_content = simulator.translate_address(
-            address, addresses, i
+            page_nums[i], offsets[i], page_nums, i
         )
-        print(f"{address},{byte_value},{frame_num},{frame_content}")
+        if quiet:
+            continue
+        output.append(f"{address},{byte_value},{frame_num},{frame_content}\n")
+        if len(output) >= OUTPUT_CHUNK:
+            sys.stdout.write("".join(output))
+            output.clear()
+    sys.stdout.write("".join(output))
     
     # Print statistics
     simulator.print_statistics()
+    simulator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file